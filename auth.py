@@ -1,8 +1,10 @@
 from passlib.context import CryptContext
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
 import os
+import time
 
 # Configuration
 # WARNING: Change SECRET_KEY in production! Use environment variables for sensitive configuration.
@@ -16,12 +18,29 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+# bcrypt delegates to the C extension (OpenSSL-backed), which is much faster
+# than passlib's pure-Python sha256_crypt loop. sha256_crypt stays listed so
+# existing hashes still verify; they are marked deprecated and re-hashed on
+# the next successful login (see verify_and_update_password).
+pwd_context = CryptContext(schemes=["bcrypt", "sha256_crypt"], deprecated="auto")
+
+# Verified against when a login names an unknown user, so the failure path
+# costs the same as a real hash check and response time does not reveal
+# whether a username exists
+DUMMY_HASH = pwd_context.hash("dummy-password")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Verify a password and return (valid, new_hash).
+
+    new_hash is a replacement hash when the stored one uses a deprecated
+    scheme, otherwise None.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
@@ -29,18 +48,36 @@ def get_password_hash(password: str) -> str:
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
+    # Store exp as an integer epoch directly so the encoder does not have
+    # to convert a tz-aware datetime per token
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expires_in = int(expires_delta.total_seconds())
     else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+        expires_in = 15 * 60
+    to_encode["exp"] = int(time.time()) + expires_in
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+@lru_cache(maxsize=4096)
+def _decode_access_token_cached(token: str) -> Optional[dict]:
+    """Decode and verify a JWT, caching the result by token string.
+
+    The same cookie token is presented on every request for its whole
+    lifetime, so the HMAC verification and JSON parsing only need to run
+    once per token. Expiry is checked by the caller on every hit, since
+    a cached payload can outlive its exp claim.
+    """
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+
 def decode_access_token(token: str) -> Optional[dict]:
     """Decode a JWT access token"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    payload = _decode_access_token_cached(token)
+    if payload is None:
+        return None
+    exp = payload.get("exp")
+    if exp is not None and time.time() >= exp:
         return None
+    return payload
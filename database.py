@@ -1,30 +1,68 @@
-import sqlite3
+import asyncio
+import threading
+import time
 from typing import List, Optional
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
+
+import aiosqlite
 
 DATABASE_NAME = "data.db"
 
-@contextmanager
-def get_db():
-    """Context manager for database connection"""
-    conn = sqlite3.connect(DATABASE_NAME)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
-
-def init_db():
+# A single shared connection avoids the open/fstat/lock syscalls and cold
+# page cache of a per-call connect/close. aiosqlite runs all statements on
+# its own worker thread, so the event loop never blocks on SQLite I/O;
+# _LOCK serializes transactions between concurrent requests.
+_CONN: Optional[aiosqlite.Connection] = None
+_LOCK = asyncio.Lock()
+
+async def connect():
+    """Open the shared database connection and apply performance pragmas"""
+    global _CONN
+    if _CONN is not None:
+        return
+    # isolation_level=None disables implicit transaction handling;
+    # get_db() issues BEGIN/COMMIT itself
+    conn = await aiosqlite.connect(DATABASE_NAME, isolation_level=None)
+    conn.row_factory = aiosqlite.Row
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    await conn.execute("PRAGMA mmap_size=268435456")
+    await conn.execute("PRAGMA cache_size=-65536")
+    await conn.execute("PRAGMA temp_store=MEMORY")
+    _CONN = conn
+
+async def close():
+    """Close the shared database connection"""
+    global _CONN
+    if _CONN is not None:
+        await _CONN.close()
+        _CONN = None
+
+@asynccontextmanager
+async def get_db():
+    """Async context manager yielding the shared database connection.
+
+    Wraps the whole block in one explicit transaction, so multi-statement
+    callers like init_db pay a single fsync instead of one per statement.
+    """
+    async with _LOCK:
+        await _CONN.execute("BEGIN")
+        try:
+            yield _CONN
+            await _CONN.execute("COMMIT")
+        except BaseException:
+            # BaseException also covers asyncio.CancelledError: a request
+            # task cancelled between BEGIN and COMMIT must not leave the
+            # shared connection inside an open transaction, or every later
+            # BEGIN fails until the process restarts
+            await _CONN.execute("ROLLBACK")
+            raise
+
+async def init_db():
     """Initialize the database with tables"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        
+    async with get_db() as conn:
         # Create data table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS data (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 title TEXT NOT NULL,
@@ -33,99 +71,376 @@ def init_db():
                 rate REAL DEFAULT 0
             )
         """)
-        
+
+        # Databases created before the rate column existed won't gain it
+        # from CREATE TABLE IF NOT EXISTS; migrate them in place
+        cursor = await conn.execute("PRAGMA table_info(data)")
+        columns = {row[1] for row in await cursor.fetchall()}
+        if "rate" not in columns:
+            await conn.execute("ALTER TABLE data ADD COLUMN rate REAL DEFAULT 0")
+
         # Create admin users table
-        cursor.execute("""
+        await conn.execute("""
             CREATE TABLE IF NOT EXISTS admins (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
                 password_hash TEXT NOT NULL
             )
         """)
-        
+
+        # Lets the query planner stream rows in keyset order instead of
+        # sorting into a temp B-tree on every request. The index must match
+        # the full (created_at, id) DESC ordering: created_at alone has
+        # one-second granularity, so ties are common and would otherwise be
+        # re-sorted on every page query. Drops the old single-column index
+        # from earlier deployments.
+        await conn.execute("DROP INDEX IF EXISTS idx_data_created_at")
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_data_created_at_id"
+            " ON data(created_at DESC, id DESC)"
+        )
+
+        # Full-text index over titles. LIKE '%q%' cannot use a B-tree index
+        # and forces a full table scan; an FTS5 trigram index answers
+        # substring queries from an inverted index instead.
+        cursor = await conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'data_fts'"
+        )
+        fts_existed = await cursor.fetchone() is not None
+        await conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS data_fts USING fts5(
+                title,
+                content='data',
+                content_rowid='id',
+                tokenize='trigram'
+            )
+        """)
+        await conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS data_fts_ai AFTER INSERT ON data BEGIN
+                INSERT INTO data_fts(rowid, title) VALUES (new.id, new.title);
+            END
+        """)
+        await conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS data_fts_ad AFTER DELETE ON data BEGIN
+                INSERT INTO data_fts(data_fts, rowid, title)
+                VALUES ('delete', old.id, old.title);
+            END
+        """)
+        await conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS data_fts_au AFTER UPDATE ON data BEGIN
+                INSERT INTO data_fts(data_fts, rowid, title)
+                VALUES ('delete', old.id, old.title);
+                INSERT INTO data_fts(rowid, title) VALUES (new.id, new.title);
+            END
+        """)
+
+        # A rebuild indexes rows inserted before the triggers existed
+        # (databases created by older versions of this schema). Only needed
+        # the first time the FTS table appears: the triggers keep it in
+        # sync afterwards, and rebuilding every boot would re-index the
+        # whole table.
+        if not fts_existed:
+            await conn.execute("INSERT INTO data_fts(data_fts) VALUES ('rebuild')")
+
         # Insert sample data if table is empty
-        cursor.execute("SELECT COUNT(*) FROM data")
-        if cursor.fetchone()[0] == 0:
+        cursor = await conn.execute("SELECT COUNT(*) FROM data")
+        row = await cursor.fetchone()
+        if row[0] == 0:
             sample_data = [
                 ("Sample Entry 1", "This is the first sample entry", 85.5),
                 ("Sample Entry 2", "This is the second sample entry", 92.0),
                 ("Sample Entry 3", "This is the third sample entry", 78.3),
             ]
-            cursor.executemany(
+            await conn.executemany(
                 "INSERT INTO data (title, description, rate) VALUES (?, ?, ?)",
                 sample_data
             )
 
-def get_all_data(search_query: Optional[str] = None) -> List[dict]:
-    """Retrieve all data entries, optionally filtered by search query"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        if search_query:
-            cursor.execute(
-                "SELECT * FROM data WHERE title LIKE ? ORDER BY created_at DESC",
-                (f"%{search_query}%",)
-            )
-        else:
-            cursor.execute("SELECT * FROM data ORDER BY created_at DESC")
-        return [dict(row) for row in cursor.fetchall()]
+# Rows returned per page by get_all_data
+PAGE_SIZE = 50
+
+# Read results only change when a data row is written: every mutating
+# helper bumps _DATA_VERSION and drops the cache, so on a read-heavy
+# workload repeat page fetches cost a dict lookup instead of a query
+# plus row materialization. The version is part of each cache key as a
+# belt-and-braces guard against stale entries.
+_DATA_VERSION = 0
+_DATA_CACHE: dict = {}
+_DATA_CACHE_MAXSIZE = 256
 
-def get_data_by_id(data_id: int) -> Optional[dict]:
+def _bump_data_version():
+    """Invalidate cached pages after a write to the data table"""
+    global _DATA_VERSION
+    _DATA_VERSION += 1
+    _DATA_CACHE.clear()
+
+def _data_cache_put(key: tuple, value):
+    if len(_DATA_CACHE) >= _DATA_CACHE_MAXSIZE:
+        _DATA_CACHE.clear()
+    _DATA_CACHE[key] = value
+
+# All SQL is frozen at module scope so every call hands SQLite the exact
+# same statement text and hits its per-connection compiled-statement
+# cache. The explicit column list skips * expansion and pins the column
+# order the columnar path relies on.
+_DATA_COLS = "id, title, description, created_at, rate"
+_DATA_COLS_D = "d.id, d.title, d.description, d.created_at, d.rate"
+_PAGE_ORDER = " ORDER BY created_at DESC, id DESC LIMIT ?"
+_PAGE_ORDER_D = " ORDER BY d.created_at DESC, d.id DESC LIMIT ?"
+
+_SQL_PAGE = f"SELECT {_DATA_COLS} FROM data" + _PAGE_ORDER
+_SQL_PAGE_CURSOR = (
+    f"SELECT {_DATA_COLS} FROM data WHERE (created_at, id) < (?, ?)" + _PAGE_ORDER
+)
+_SQL_PAGE_LIKE = f"SELECT {_DATA_COLS} FROM data WHERE title LIKE ?" + _PAGE_ORDER
+_SQL_PAGE_LIKE_CURSOR = (
+    f"SELECT {_DATA_COLS} FROM data WHERE title LIKE ?"
+    " AND (created_at, id) < (?, ?)" + _PAGE_ORDER
+)
+_SQL_PAGE_FTS = (
+    f"SELECT {_DATA_COLS_D} FROM data d JOIN data_fts f ON f.rowid = d.id"
+    " WHERE data_fts MATCH ?" + _PAGE_ORDER_D
+)
+_SQL_PAGE_FTS_CURSOR = (
+    f"SELECT {_DATA_COLS_D} FROM data d JOIN data_fts f ON f.rowid = d.id"
+    " WHERE data_fts MATCH ? AND (d.created_at, d.id) < (?, ?)" + _PAGE_ORDER_D
+)
+_SQL_GET_BY_ID = f"SELECT {_DATA_COLS} FROM data WHERE id = ?"
+_SQL_INSERT_DATA = "INSERT INTO data (title, description, rate) VALUES (?, ?, ?)"
+_SQL_INSERT_DATA_WITH_ID = (
+    "INSERT INTO data (id, title, description, rate) VALUES (?, ?, ?, ?)"
+)
+_SQL_UPDATE_DATA = "UPDATE data SET title = ?, description = ?, rate = ? WHERE id = ?"
+_SQL_DELETE_DATA = "DELETE FROM data WHERE id = ?"
+_SQL_GET_RATES = "SELECT rate FROM data"
+_SQL_GET_ADMIN = "SELECT id, username, password_hash FROM admins WHERE username = ?"
+_SQL_UPDATE_ADMIN_PASSWORD = "UPDATE admins SET password_hash = ? WHERE username = ?"
+_SQL_INSERT_ADMIN = "INSERT INTO admins (username, password_hash) VALUES (?, ?)"
+
+def _data_page_query(
+    search_query: Optional[str],
+    limit: int,
+    cursor_created_at: Optional[str],
+    cursor_id: Optional[int]
+) -> tuple:
+    """Pick the SQL constant and bind params for one page of data entries"""
+    has_cursor = cursor_created_at is not None and cursor_id is not None
+    if search_query:
+        if len(search_query) >= 3:
+            # Quote the query so FTS5 treats it as a literal string;
+            # the trigram tokenizer then matches it as a substring
+            match = '"' + search_query.replace('"', '""') + '"'
+            if has_cursor:
+                return _SQL_PAGE_FTS_CURSOR, (match, cursor_created_at, cursor_id, limit)
+            return _SQL_PAGE_FTS, (match, limit)
+        # trigram needs at least 3 characters; fall back to LIKE
+        pattern = f"%{search_query}%"
+        if has_cursor:
+            return _SQL_PAGE_LIKE_CURSOR, (pattern, cursor_created_at, cursor_id, limit)
+        return _SQL_PAGE_LIKE, (pattern, limit)
+    if has_cursor:
+        return _SQL_PAGE_CURSOR, (cursor_created_at, cursor_id, limit)
+    return _SQL_PAGE, (limit,)
+
+async def get_all_data(
+    search_query: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    cursor_created_at: Optional[str] = None,
+    cursor_id: Optional[int] = None
+) -> List[dict]:
+    """Retrieve a page of data entries, optionally filtered by search query.
+
+    Pages use keyset pagination on (created_at, id): pass the created_at
+    and id of the last row of the previous page to fetch the next one.
+    """
+    key = ("dicts", _DATA_VERSION, search_query, limit, cursor_created_at, cursor_id)
+    cached = _DATA_CACHE.get(key)
+    if cached is not None:
+        return cached
+    sql, params = _data_page_query(search_query, limit, cursor_created_at, cursor_id)
+    async with get_db() as conn:
+        cursor = await conn.execute(sql, params)
+        rows = await cursor.fetchall()
+    result = [dict(row) for row in rows]
+    _data_cache_put(key, result)
+    return result
+
+async def get_all_data_columnar(
+    search_query: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+    cursor_created_at: Optional[str] = None,
+    cursor_id: Optional[int] = None
+) -> tuple:
+    """Like get_all_data, but returns (columns, rows) with rows as tuples.
+
+    Skips the per-row dict materialization: a single column list plus a
+    list of tuples is cheaper to build and to serialize than N row dicts.
+    """
+    key = ("columnar", _DATA_VERSION, search_query, limit, cursor_created_at, cursor_id)
+    cached = _DATA_CACHE.get(key)
+    if cached is not None:
+        return cached
+    sql, params = _data_page_query(search_query, limit, cursor_created_at, cursor_id)
+    async with get_db() as conn:
+        cursor = await conn.execute(sql, params)
+        cursor.row_factory = None  # plain tuples instead of aiosqlite.Row
+        rows = await cursor.fetchall()
+        columns = [c[0] for c in cursor.description]
+    result = (columns, rows)
+    _data_cache_put(key, result)
+    return result
+
+def _rate_stats_kernel_py(rates):
+    """Single-pass mean/min/max/stddev over a float64 array.
+
+    Plain-Python source for the Numba kernel; compiled lazily by
+    rate_stats so numpy/numba stay off the web request path.
+    """
+    total = 0.0
+    total_sq = 0.0
+    lo = rates[0]
+    hi = rates[0]
+    for i in range(rates.size):
+        v = rates[i]
+        total += v
+        total_sq += v * v
+        if v < lo:
+            lo = v
+        if v > hi:
+            hi = v
+    mean = total / rates.size
+    var = total_sq / rates.size - mean * mean
+    if var < 0.0:  # guard against rounding
+        var = 0.0
+    return mean, lo, hi, var ** 0.5
+
+# Compiled kernel, created on first rate_stats call
+_rate_stats_kernel = None
+
+async def rate_stats() -> dict:
+    """Compute summary statistics over the rate column.
+
+    Pulls the rates into a NumPy array once and reduces them with a
+    Numba-compiled single-pass kernel; cache=True persists the compiled
+    code across process restarts so only the first-ever call pays the
+    JIT cost.
+    """
+    global _rate_stats_kernel
+    if _rate_stats_kernel is None:
+        from numba import njit
+        _rate_stats_kernel = njit(cache=True, fastmath=True)(_rate_stats_kernel_py)
+    import numpy as np
+
+    async with get_db() as conn:
+        cursor = await conn.execute(_SQL_GET_RATES)
+        cursor.row_factory = None
+        rows = await cursor.fetchall()
+    rates = np.fromiter((row[0] for row in rows), dtype=np.float64)
+    if rates.size == 0:
+        return {"count": 0, "mean": None, "min": None, "max": None, "stddev": None}
+    mean, lo, hi, stddev = _rate_stats_kernel(rates)
+    return {
+        "count": int(rates.size),
+        "mean": mean,
+        "min": lo,
+        "max": hi,
+        "stddev": stddev
+    }
+
+async def get_data_by_id(data_id: int) -> Optional[dict]:
     """Retrieve a single data entry by ID"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM data WHERE id = ?", (data_id,))
-        row = cursor.fetchone()
+    async with get_db() as conn:
+        cursor = await conn.execute(_SQL_GET_BY_ID, (data_id,))
+        row = await cursor.fetchone()
         return dict(row) if row else None
 
-def create_data(title: str, description: str, rate: float = 0.0, custom_id: Optional[int] = None) -> int:
+async def create_data(title: str, description: str, rate: float = 0.0, custom_id: Optional[int] = None) -> int:
     """Create a new data entry with optional custom ID"""
-    with get_db() as conn:
-        cursor = conn.cursor()
+    async with get_db() as conn:
         if custom_id is not None:
             # Insert with custom ID
-            cursor.execute(
-                "INSERT INTO data (id, title, description, rate) VALUES (?, ?, ?, ?)",
+            await conn.execute(
+                _SQL_INSERT_DATA_WITH_ID,
                 (custom_id, title, description, rate)
             )
-            return custom_id
+            new_id = custom_id
         else:
             # Auto-generate ID
-            cursor.execute(
-                "INSERT INTO data (title, description, rate) VALUES (?, ?, ?)",
+            cursor = await conn.execute(
+                _SQL_INSERT_DATA,
                 (title, description, rate)
             )
-            return cursor.lastrowid
+            new_id = cursor.lastrowid
+    _bump_data_version()
+    return new_id
 
-def update_data(data_id: int, title: str, description: str, rate: float = 0.0) -> bool:
+async def update_data(data_id: int, title: str, description: str, rate: float = 0.0) -> bool:
     """Update an existing data entry"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE data SET title = ?, description = ?, rate = ? WHERE id = ?",
+    async with get_db() as conn:
+        cursor = await conn.execute(
+            _SQL_UPDATE_DATA,
             (title, description, rate, data_id)
         )
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+    if updated:
+        _bump_data_version()
+    return updated
 
-def delete_data(data_id: int) -> bool:
+async def delete_data(data_id: int) -> bool:
     """Delete a data entry"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM data WHERE id = ?", (data_id,))
-        return cursor.rowcount > 0
-
-def get_admin_by_username(username: str) -> Optional[dict]:
-    """Retrieve admin user by username"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM admins WHERE username = ?", (username,))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+    async with get_db() as conn:
+        cursor = await conn.execute(_SQL_DELETE_DATA, (data_id,))
+        deleted = cursor.rowcount > 0
+    if deleted:
+        _bump_data_version()
+    return deleted
+
+# Admin rows change rarely; cache lookups for a short TTL so repeated
+# login probes resolve from memory instead of querying SQLite each time.
+# Values are (expires_at, row-or-None); misses are cached too.
+_ADMIN_CACHE_TTL = 30  # seconds
+_ADMIN_CACHE_MAXSIZE = 64
+_ADMIN_CACHE: dict = {}
+_ADMIN_CACHE_LOCK = threading.Lock()
+
+def _invalidate_admin_cache(username: str):
+    """Drop a cached admin row after a write to the admins table"""
+    with _ADMIN_CACHE_LOCK:
+        _ADMIN_CACHE.pop(username, None)
+
+async def get_admin_by_username(username: str) -> Optional[dict]:
+    """Retrieve admin user by username (cached for a short TTL)"""
+    now = time.monotonic()
+    with _ADMIN_CACHE_LOCK:
+        cached = _ADMIN_CACHE.get(username)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+    async with get_db() as conn:
+        cursor = await conn.execute(_SQL_GET_ADMIN, (username,))
+        row = await cursor.fetchone()
+    result = dict(row) if row else None
+    with _ADMIN_CACHE_LOCK:
+        if len(_ADMIN_CACHE) >= _ADMIN_CACHE_MAXSIZE:
+            _ADMIN_CACHE.clear()
+        _ADMIN_CACHE[username] = (now + _ADMIN_CACHE_TTL, result)
+    return result
+
+async def update_admin_password(username: str, password_hash: str) -> bool:
+    """Update the stored password hash for an admin user"""
+    async with get_db() as conn:
+        cursor = await conn.execute(
+            _SQL_UPDATE_ADMIN_PASSWORD,
+            (password_hash, username)
+        )
+        updated = cursor.rowcount > 0
+    _invalidate_admin_cache(username)
+    return updated
 
-def create_admin(username: str, password_hash: str):
+async def create_admin(username: str, password_hash: str):
     """Create a new admin user"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO admins (username, password_hash) VALUES (?, ?)",
+    async with get_db() as conn:
+        await conn.execute(
+            _SQL_INSERT_ADMIN,
             (username, password_hash)
         )
+    _invalidate_admin_cache(username)
@@ -1,10 +1,12 @@
 from fastapi import FastAPI, Request, Form, Cookie, HTTPException, Query
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, RedirectResponse, ORJSONResponse
 from fastapi.templating import Jinja2Templates
 from typing import Optional
 from datetime import timedelta, datetime
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import jinja2
 import os
 import database
 import auth
@@ -14,24 +16,38 @@ load_dotenv()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize database and create default admin user"""
-    database.init_db()
-    
+    await database.connect()
+    await database.init_db()
+
     # Create default admin user if doesn't exist
-    admin = database.get_admin_by_username("admin")
+    admin = await database.get_admin_by_username("admin")
     if not admin:
-        password_hash = auth.get_password_hash(os.getenv("PASS"))
-        database.create_admin("admin", password_hash)
+        password_hash = await run_in_threadpool(auth.get_password_hash, os.getenv("PASS"))
+        await database.create_admin("admin", password_hash)
         print("Default admin user created: admin/admin123")
-    
+
     yield
-    # Cleanup on shutdown (if needed)
+    await database.close()
 
 # Initialize FastAPI app
-app = FastAPI(title="Database Viewer", version="1.0.0", lifespan=lifespan)
+# orjson encodes row-heavy payloads several times faster than stdlib json
+app = FastAPI(
+    title="Database Viewer",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Setup templates
 templates = Jinja2Templates(directory="templates")
 
+# Templates do not change at runtime: skip the per-render os.stat freshness
+# check, keep every compiled template in memory, and persist compiled
+# bytecode across restarts
+templates.env.auto_reload = False
+templates.env.cache_size = 400
+templates.env.bytecode_cache = jinja2.FileSystemBytecodeCache()
+
 # Add custom Jinja2 filter for date formatting
 def format_date(date_string):
     """Format date string to YYYY/MM/DD"""
@@ -60,12 +76,21 @@ async def index(
     access_token: Optional[str] = Cookie(None), 
     message: Optional[str] = Query(None, max_length=200),
     message_type: Optional[str] = Query(None, regex="^(success|error)$"),
-    search: Optional[str] = Query(None, max_length=200)
+    search: Optional[str] = Query(None, max_length=200),
+    cursor_created_at: Optional[str] = Query(None, max_length=32),
+    cursor_id: Optional[int] = Query(None)
 ):
-    """Home page - display all data entries"""
+    """Home page - display a page of data entries"""
     user = get_current_user(access_token)
-    data_entries = database.get_all_data(search_query=search)
-    
+    data_entries = await database.get_all_data(
+        search_query=search,
+        cursor_created_at=cursor_created_at,
+        cursor_id=cursor_id
+    )
+
+    # A full page means there may be older entries to load
+    next_cursor = data_entries[-1] if len(data_entries) == database.PAGE_SIZE else None
+
     return templates.TemplateResponse("index.html", {
         "request": request,
         "data": data_entries,
@@ -73,7 +98,8 @@ async def index(
         "username": user.get("username") if user else None,
         "message": message,
         "message_type": message_type,
-        "search_query": search or ""
+        "search_query": search or "",
+        "next_cursor": next_cursor
     })
 
 @app.get("/admin/login", response_class=HTMLResponse)
@@ -92,14 +118,27 @@ async def login_page(request: Request, access_token: Optional[str] = Cookie(None
 @app.post("/admin/login")
 async def login(request: Request, username: str = Form(...), password: str = Form(...)):
     """Handle admin login"""
-    admin = database.get_admin_by_username(username)
-    
-    if not admin or not auth.verify_password(password, admin["password_hash"]):
+    admin = await database.get_admin_by_username(username)
+
+    # Always run a full hash verification, against a dummy hash when the
+    # username is unknown, so the two failure paths take the same time.
+    # bcrypt blocks for tens of milliseconds, so it runs off the event
+    # loop; the thread pool also lets concurrent logins hash in parallel
+    # since bcrypt's C extension releases the GIL.
+    stored_hash = admin["password_hash"] if admin else auth.DUMMY_HASH
+    valid, new_hash = await run_in_threadpool(
+        auth.verify_and_update_password, password, stored_hash
+    )
+    if not admin or not valid:
         return templates.TemplateResponse("login.html", {
             "request": request,
             "error": "Invalid username or password"
         })
-    
+
+    # Transparently migrate hashes from deprecated schemes to bcrypt
+    if new_hash:
+        await database.update_admin_password(username, new_hash)
+
     # Create access token
     access_token = auth.create_access_token(
         data={"username": username},
@@ -124,10 +163,26 @@ async def logout():
     return response
 
 @app.get("/data")
-async def get_data(search: Optional[str] = Query(None, max_length=200)):
-    """API endpoint to get all data entries"""
-    data_entries = database.get_all_data(search_query=search)
-    return {"data": data_entries}
+async def get_data(
+    search: Optional[str] = Query(None, max_length=200),
+    cursor_created_at: Optional[str] = Query(None, max_length=32),
+    cursor_id: Optional[int] = Query(None)
+):
+    """API endpoint to get a page of data entries.
+
+    Returns a column list plus rows as arrays, which is cheaper to build
+    and serialize than a dict per row.
+    """
+    columns, rows = await database.get_all_data_columnar(
+        search_query=search,
+        cursor_created_at=cursor_created_at,
+        cursor_id=cursor_id
+    )
+    next_cursor = None
+    if len(rows) == database.PAGE_SIZE:
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = {"created_at": last["created_at"], "id": last["id"]}
+    return {"columns": columns, "rows": rows, "next_cursor": next_cursor}
 
 @app.post("/data")
 async def create_data(
@@ -144,7 +199,7 @@ async def create_data(
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     try:
-        database.create_data(title, description, rate, custom_id)
+        await database.create_data(title, description, rate, custom_id)
         return RedirectResponse(url="/?message=Entry created successfully&message_type=success", 
                               status_code=303)
     except Exception as e:
@@ -174,7 +229,7 @@ async def update_data(
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    success = database.update_data(data_id, title, description, rate)
+    success = await database.update_data(data_id, title, description, rate)
     if not success:
         raise HTTPException(status_code=404, detail="Data entry not found")
     
@@ -188,11 +243,11 @@ async def delete_data(data_id: int, access_token: Optional[str] = Cookie(None)):
     if not user:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    success = database.delete_data(data_id)
+    success = await database.delete_data(data_id)
     if not success:
         raise HTTPException(status_code=404, detail="Data entry not found")
     
-    return JSONResponse(content={"message": "Entry deleted successfully"})
+    return {"message": "Entry deleted successfully"}
 
 if __name__ == "__main__":
     import uvicorn